@@ -6,44 +6,54 @@ the media files, and downloads them to a specified local directory.
 
 import os
 import argparse
-from urllib.parse import urlparse
+from functools import lru_cache
+from types import MappingProxyType
+from urllib.parse import urlsplit
 
 import requests
+from lxml import etree
 
 from helpers.managers.live_manager import LiveManager
 from helpers.managers.log_manager import LoggerTable
 from helpers.managers.progress_manager import ProgressManager
 
-from helpers.download_utils import save_file_with_progress, run_in_parallel
+from helpers.download_utils import (
+    save_file_with_progress, save_file_in_ranges, get_total_size,
+    run_in_parallel, RANGE_MIN_SIZE, PART_SUFFIX
+)
+from helpers.file_utils import get_files_in_dir
 from helpers.general_utils import (
-    fetch_page, create_download_directory, clear_terminal
+    SESSION, fetch_page, create_download_directory, clear_terminal
 )
 from helpers.erome_utils import (
-    validate_url, extract_profile_name, extract_hostname
+    validate_url, extract_profile_name
+)
+
+# Video sources and full-size images (the `img-back` class) in a single pass,
+# compiled once at import time
+MEDIA_XPATH = etree.XPath(
+    "//source/@src"
+    " | //img[contains(concat(' ', normalize-space(@class), ' '),"
+    " ' img-back ')]/@data-src",
+    smart_strings=False
 )
 
-def extract_download_links(album_url):
+def extract_download_links(tree):
     """
-    Extracts download links for video and image sources from the specified 
-    album URL.
+    Extracts download links for video and image sources from a parsed album
+    page.
 
     Args:
-        album_url (str): The URL of the album from which to extract media
-                         links.
+        tree (lxml.html.HtmlElement): The parsed HTML of the album page.
 
     Returns:
         List[str]: A list of unique download links (video and image URLs)
                    extracted from the album page.
     """
-    soup = fetch_page(album_url)
-    videos = [video_source["src"] for video_source in soup.find_all("source")]
-    images = [
-        image["data-src"]
-        for image in soup.find_all("img", {"class": "img-back"})
-    ]
-    return list(set([*videos, *images]))
+    download_links = MEDIA_XPATH(tree)
+    return list(dict.fromkeys(download_links))
 
-def download_album(album_url, live_manager, profile=None):
+def download_album(album_url, live_manager, profile=None, tree=None):
     """
     Downloads an album from the given URL.
 
@@ -55,21 +65,58 @@ def download_album(album_url, live_manager, profile=None):
         profile (str): A path to a user-specific profile directory where the
                        album should be saved. If None, the album is saved in
                        the default location.
+        tree (lxml.html.HtmlElement, optional): The already parsed album page.
+                                                If None, the page is fetched.
     """
-    download_links = extract_download_links(album_url)
+    if tree is None:
+        tree = fetch_page(album_url)
+
+    # Group links by host (stable, so page order is kept within a host) so
+    # that consecutive downloads hit the same warm connections
+    download_links = sorted(
+        extract_download_links(tree),
+        key=lambda link: urlsplit(link).netloc
+    )
 
-    album_id = album_url.split('/')[-1]
+    album_id = album_url.rpartition('/')[2]
     album_path = album_id if not profile else os.path.join(profile, album_id)
     download_path = create_download_directory(album_path)
+    existing_files = get_files_in_dir(download_path)
 
     run_in_parallel(
         download,
         download_links, live_manager,
-        album_id, download_path, album_url
+        album_id, download_path, album_url, existing_files
     )
 
+@lru_cache(maxsize=128)
+def build_headers(hostname, album_url=None):
+    """
+    Builds the per-request headers expected by the Erome media hosts. Every
+    file of an album shares the same headers, so they are built once per
+    hostname and album and returned as a read-only mapping.
+
+    Args:
+        hostname (str): The hostname to be used in the `Referer` and `Origin`
+                        headers.
+        album_url (str, optional): An optional URL of the album to use as the
+                                   `Referer` header. If not provided, the
+                                   `Referer` will default to the base URL
+                                   formed from the `hostname`.
+
+    Returns:
+        MappingProxyType: The request headers.
+    """
+    return MappingProxyType({
+        "Referer": f"https://{hostname}" if not album_url else album_url,
+        "Origin": f"https://{hostname}",
+        # Media is already compressed; also keeps sizes and ranges in raw bytes
+        "Accept-Encoding": "identity"
+    })
+
 def configure_session(
-    url, hostname, album_url=None, timeout=10, read_timeout=20
+    url, hostname, album_url=None, timeout=10, read_timeout=20,
+    byte_range=None
 ):
     """
     Configures a GET request with custom headers and timeouts using a global
@@ -87,27 +134,71 @@ def configure_session(
                                  (default is 10).
         read_timeout (int, optional): The timeout value for the read operation
                                       in seconds (default is 20).
+        byte_range (tuple, optional): An inclusive `(start, end)` byte range
+                                      to request instead of the whole file.
+                                      An `end` of None requests everything
+                                      from `start` onwards.
 
     Returns:
         Response: The response object from the GET request, which contains the
                   server's response to the HTTP request.
     """
-    return requests.Session().get(
+    headers = build_headers(hostname, album_url)
+    if byte_range is not None:
+        start, end = byte_range
+        headers = {
+            **headers, "Range": f"bytes={start}-{'' if end is None else end}"
+        }
+
+    return SESSION.get(
         url,
         stream=True,
-        headers={
-            "Referer": f"https://{hostname}" if not album_url else album_url,
-            "Origin": f"https://{hostname}",
-            "User-Agent": "Mozila/5.0",
-            "Connection": "keep-alive"
-        },
+        headers=headers,
         timeout=(timeout, read_timeout)
     )
 
-def download(download_link, task, live_manager, download_path, album_url):
+def probe_file(url, hostname, album_url=None, timeout=10):
+    """
+    Sends a HEAD request to learn the size of a remote file and whether the
+    server accepts byte range requests for it.
+
+    Args:
+        url (str): The URL of the file to probe.
+        hostname (str): The hostname to be used in the `Referer` and `Origin`
+                        headers.
+        album_url (str, optional): An optional URL of the album to use as the
+                                   `Referer` header.
+        timeout (int, optional): The timeout value in seconds (default is 10).
+
+    Returns:
+        tuple: The file size in bytes (-1 if unknown) and a boolean telling
+               whether byte range requests are supported.
+    """
+    try:
+        response = SESSION.head(
+            url,
+            headers=build_headers(hostname, album_url),
+            timeout=timeout,
+            allow_redirects=True
+        )
+        response.raise_for_status()
+
+    except requests.RequestException:
+        return -1, False
+
+    file_size = int(response.headers.get("content-length", -1))
+    accepts_ranges = response.headers.get("accept-ranges") == "bytes"
+    return file_size, accepts_ranges
+
+def download(
+    download_link, task, live_manager, download_path, album_url,
+    existing_files
+):
     """
     Downloads a file from the specified download link and saves it to the given
-    path.
+    path. Files already present are skipped and partial ones are resumed;
+    large files are fetched as parallel byte ranges when the server supports
+    it.
 
     Args:
         download_link (str): The URL of the file to be downloaded.
@@ -119,14 +210,68 @@ def download(download_link, task, live_manager, download_path, album_url):
                              saved.
         album_url (str): The URL of the album, used to configure the session or
                          for additional context.
+        existing_files (set): The names of the files already present in
+                              `download_path`.
     """
-    parsed_url = urlparse(download_link)
-    file_name = os.path.basename(parsed_url.path)
+    # Parse the link once; the hostname is its netloc
+    parsed_url = urlsplit(download_link)
+    file_name = parsed_url.path.rpartition('/')[2]
 
-    hostname = extract_hostname(download_link)
+    hostname = parsed_url.netloc
     final_path = os.path.join(download_path, file_name)
 
-    with configure_session(download_link, hostname, album_url) as response:
+    # Files only get their final name once their last byte is written, so
+    # one fetched by a previous run is complete whatever its size
+    if file_name in existing_files:
+        live_manager.update_task(task, completed=100)
+        return
+
+    def fetch(byte_range=None):
+        return configure_session(
+            download_link, hostname, album_url, byte_range=byte_range
+        )
+
+    # Left incomplete by a previous run, only fetch the missing tail. This is
+    # the only case that needs the size and range support before the first
+    # byte is requested
+    if file_name + PART_SUFFIX in existing_files:
+        part_size = os.path.getsize(final_path + PART_SUFFIX)
+        file_size, accepts_ranges = probe_file(
+            download_link, hostname, album_url
+        )
+        if accepts_ranges and 0 < part_size < file_size:
+            with fetch(byte_range=(part_size, None)) as response:
+                response.raise_for_status()
+                save_file_with_progress(
+                    response, final_path, task, live_manager
+                )
+            return
+
+    # An open-ended range returns the whole file like a plain request, but a
+    # partial (206) answer also proves that ranges are supported and gives the
+    # file size in `Content-Range`, which saves a HEAD request per file
+    with fetch(byte_range=(0, None)) as response:
+        file_size = get_total_size(response)
+        use_ranges = (
+            response.status_code == 206 and file_size >= RANGE_MIN_SIZE
+        )
+
+        if use_ranges and hasattr(os, "pwrite"):
+            if save_file_in_ranges(
+                fetch, response, final_path, file_size, task, live_manager
+            ):
+                return
+
+        elif response.status_code != 416:
+            response.raise_for_status()
+            save_file_with_progress(response, final_path, task, live_manager)
+            return
+
+    # An empty file has no first byte, so its range is unsatisfiable (416),
+    # and a later range may be answered with the full content; both fall back
+    # to a plain request for a single stream
+    with fetch() as response:
+        response.raise_for_status()
         save_file_with_progress(response, final_path, task, live_manager)
 
 def initialize_managers():
@@ -3,39 +3,74 @@ This module provides utilities for handling file downloads with progress
 tracking.
 """
 
-from concurrent.futures import ThreadPoolExecutor
+import os
+import shutil
+from functools import partial
+from threading import Event, Lock
+from concurrent.futures import (
+    ThreadPoolExecutor, FIRST_COMPLETED, as_completed, wait
+)
 
 MAX_WORKERS = 3
 
+# Submitted but unfinished downloads per album; enough to keep every worker
+# busy without queueing (and tracking) the whole album at once
+MAX_PENDING = MAX_WORKERS * 2
+
 KB = 1024
 MB = 1024 * KB
 
-def get_chunk_size(file_size):
+# Read size of every download, large enough that the per-chunk Python work
+# is negligible even for small files
+CHUNK_SIZE = 256 * KB
+
+# Size of the write buffer of downloaded files, so that small chunks are
+# coalesced into fewer `write()` syscalls
+WRITE_BUFFER_SIZE = 1 * MB
+
+# Progress is reported every 1% of a file rather than on every chunk
+PROGRESS_STEPS = 100
+
+# Files at least this large are fetched as several parallel byte ranges
+RANGE_MIN_SIZE = 8 * MB
+RANGE_SEGMENTS = 4
+
+# Downloads are written under a temporary name and only renamed to their final
+# one after their last byte, so a file with its final name is always complete.
+# Sequential downloads grow in order and can be resumed from their size;
+# ranged ones have holes and are restarted instead
+PART_SUFFIX = ".part"
+RANGES_PART_SUFFIX = ".ranges.part"
+
+def release_page_cache(file):
     """
-    Determines the optimal chunk size based on the file size.
+    Hints the kernel that a downloaded file will not be read back, so its
+    cached pages can be dropped instead of evicting more useful data. This is
+    best effort: the kernel only drops pages already written back to disk, and
+    the file is not synced to force that, so dirty pages stay cached until
+    written back as usual.
 
     Args:
-        file_size (int): The size of the file in bytes.
-
-    Returns:
-        int: The optimal chunk size in bytes.
+        file (file object): The file opened for writing.
     """
-    thresholds = [
-        (1 * MB, 4 * KB),     # Less than 1 MB
-        (10 * MB, 16 * KB),   # 1 MB to 10 MB
-        (100 * MB, 64 * KB),  # 10 MB to 100 MB
-    ]
+    if not hasattr(os, "posix_fadvise"):
+        return
 
-    for threshold, chunk_size in thresholds:
-        if file_size < threshold:
-            return chunk_size
+    file.flush()
+    try:
+        os.posix_fadvise(file.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
 
-    return 128 * KB
+    except OSError:
+        # The hint is optional; filesystems that reject it keep the cache
+        pass
 
 def save_file_with_progress(response, download_path, task, live_manager):
     """
     Saves the content of a response to a file while tracking and updating
-    download progress.
+    download progress. The content is written to `<download_path>.part`,
+    which is renamed to `download_path` once complete; a partial (206)
+    response resumes that file at the offset given by its `Content-Range`
+    header instead of overwriting it.
 
     Args:
         response (requests.Response): The HTTP response containing the content
@@ -46,37 +81,286 @@ def save_file_with_progress(response, download_path, task, live_manager):
                     download.
         live_manager (LiveManager): An object responsible for managing and
                                     tracking the progress of live tasks.
+
+    Raises:
+        OSError: If the connection ends before the whole file is received; the
+                 partial file is kept so that it can be resumed.
     """
+    part_path = download_path + PART_SUFFIX
     file_size = int(response.headers.get("content-length", -1))
-    chunk_size=get_chunk_size(file_size)
     total_downloaded = 0
 
-    with open(download_path, 'wb') as file:
-        for chunk in response.iter_content(chunk_size=chunk_size):
-            if chunk:
-                file.write(chunk)
+    if response.status_code == 206:
+        # Content-Range: bytes <start>-<end>/<total>
+        content_range = response.headers["content-range"]
+        total_downloaded = int(content_range.split()[1].split("-")[0])
+        if file_size > 0:
+            file_size += total_downloaded
+
+    mode = 'r+b' if total_downloaded else 'wb'
+
+    # Read straight from the urllib3 stream rather than through the
+    # `iter_content` generator. Media requests ask for `identity` encoding, so
+    # `decode_content` is only a safeguard against servers that compress anyway
+    response.raw.decode_content = True
+
+    if 0 < file_size <= CHUNK_SIZE and mode == 'wb':
+        # A file that fits in one chunk is written in one go, without the
+        # progress steps and cache hints of the streaming path
+        content = response.raw.read()
+        with open(part_path, mode) as file:
+            file.write(content)
+
+        os.replace(part_path, download_path)
+        live_manager.update_task(task, completed=100)
+        return
+
+    read_chunk = partial(response.raw.read, CHUNK_SIZE)
+
+    with open(part_path, mode, buffering=WRITE_BUFFER_SIZE) as file:
+        file.seek(total_downloaded)
+
+        if file_size <= 0:
+            # Without a known size there is no percentage to report, so the
+            # copy loop can run entirely inside shutil
+            shutil.copyfileobj(response.raw, file, CHUNK_SIZE)
+
+        else:
+            update_step = max(file_size // PROGRESS_STEPS, 1)
+            next_update = total_downloaded + update_step
+
+            # Bound methods resolved once instead of on every chunk
+            write = file.write
+            update_task = live_manager.update_task
+
+            for chunk in iter(read_chunk, b''):
+                write(chunk)
                 total_downloaded += len(chunk)
-                progress_percentage = (total_downloaded / file_size) * 100
+
+                if total_downloaded >= next_update:
+                    next_update = total_downloaded + update_step
+                    progress_percentage = total_downloaded * 100 // file_size
+                    update_task(task, completed=progress_percentage)
+
+            if total_downloaded < file_size:
+                raise OSError(
+                    f"Connection closed after {total_downloaded} of "
+                    f"{file_size} bytes of {download_path}"
+                )
+
+        release_page_cache(file)
+
+    os.replace(part_path, download_path)
+    live_manager.update_task(task, completed=100)
+
+def split_byte_ranges(file_size, num_segments=RANGE_SEGMENTS):
+    """
+    Splits a file into contiguous byte ranges of roughly equal size.
+
+    Args:
+        file_size (int): The size of the file in bytes.
+        num_segments (int, optional): The number of ranges to produce
+                                      (default is `RANGE_SEGMENTS`).
+
+    Returns:
+        list: A list of `(start, end)` tuples with inclusive byte offsets, as
+              expected by the HTTP `Range` header.
+    """
+    segment_size = -(-file_size // num_segments)
+    return [
+        (start, min(start + segment_size, file_size) - 1)
+        for start in range(0, file_size, segment_size)
+    ]
+
+def get_total_size(response):
+    """
+    Reads the full size of a remote file from the response to a request for
+    it, which may have asked for a byte range only.
+
+    Args:
+        response (requests.Response): The HTTP response for the file.
+
+    Returns:
+        int: The size of the whole file in bytes, or -1 if it is unknown.
+    """
+    if response.status_code == 206:
+        # Content-Range: bytes <start>-<end>/<total>, where total may be `*`
+        total = response.headers.get("content-range", "").rpartition("/")[2]
+        return int(total) if total.isdigit() else -1
+
+    return int(response.headers.get("content-length", -1))
+
+def save_file_in_ranges(
+    fetch_range, first_response, download_path, file_size, task, live_manager
+):
+    """
+    Downloads a file as several byte ranges fetched in parallel, writing each
+    range at its own offset of the destination file, while tracking and
+    updating download progress. The first range is read from a response that
+    already starts at the beginning of the file, so it costs no new request.
+
+    Args:
+        fetch_range (callable): A function that takes a `(start, end)` byte
+                                range and returns the streamed HTTP response
+                                for that range.
+        first_response (requests.Response): A partial (206) response starting
+                                            at the first byte of the file.
+        download_path (str): The local file path where the content should be
+                             saved.
+        file_size (int): The size of the file in bytes.
+        task (int): The task ID used to track and report progress of the
+                    download.
+        live_manager (LiveManager): An object responsible for managing and
+                                    tracking the progress of live tasks.
+
+    Returns:
+        bool: True if the file was downloaded, False if the server answered a
+              range request with the full content instead of a partial one,
+              in which case nothing is kept and the file should be fetched as
+              a single stream.
+
+    Raises:
+        OSError: If a range ends before all of its bytes are received.
+    """
+    temp_path = download_path + RANGES_PART_SUFFIX
+    first_range, *other_ranges = split_byte_ranges(file_size)
+    progress_lock = Lock()
+    update_step = max(file_size // PROGRESS_STEPS, 1)
+    total_downloaded = 0
+    next_update = update_step
+
+    # Set when a range is refused or fails, so the other ranges stop after
+    # their current chunk instead of downloading data that will be discarded
+    stop = Event()
+
+    def save_range(file_descriptor, byte_range, response):
+        nonlocal total_downloaded, next_update
+        offset, end = byte_range
+
+        if response.status_code != 206:
+            stop.set()
+            return
+
+        # The first response is open-ended, so every range is read up to its
+        # own end rather than until its stream is exhausted
+        read = response.raw.read
+        while offset <= end and not stop.is_set():
+            chunk = read(min(CHUNK_SIZE, end - offset + 1))
+            if not chunk:
+                break
+
+            # `pwrite` may write less than asked, so the rest of the chunk is
+            # written until nothing is left instead of leaving a hole
+            view = memoryview(chunk)
+            while view:
+                written = os.pwrite(file_descriptor, view, offset)
+                view = view[written:]
+                offset += written
+
+            with progress_lock:
+                total_downloaded += len(chunk)
+                if total_downloaded < next_update:
+                    continue
+
+                next_update = total_downloaded + update_step
+                progress_percentage = total_downloaded * 100 // file_size
                 live_manager.update_task(task, completed=progress_percentage)
 
-def manage_running_tasks(futures, live_manager):
+        if offset <= end and not stop.is_set():
+            raise OSError(
+                f"Connection closed after {offset - byte_range[0]} bytes of "
+                f"range {byte_range[0]}-{end} of {download_path}"
+            )
+
+    def save_first_range(file_descriptor):
+        # The first response is open-ended; it is closed as soon as its range
+        # is read so that its connection does not stay busy until every other
+        # range is done
+        try:
+            save_range(file_descriptor, first_range, first_response)
+
+        finally:
+            first_response.close()
+
+    def fetch_and_save_range(file_descriptor, byte_range):
+        with fetch_range(byte_range) as response:
+            response.raise_for_status()
+            save_range(file_descriptor, byte_range, response)
+
+    first_response.raw.decode_content = True
+
+    try:
+        with open(temp_path, 'wb') as file:
+            file_descriptor = file.fileno()
+            num_workers = 1 + len(other_ranges)
+
+            with ThreadPoolExecutor(max_workers=num_workers) as executor:
+                futures = [executor.submit(save_first_range, file_descriptor)]
+                futures.extend(
+                    executor.submit(
+                        fetch_and_save_range, file_descriptor, byte_range
+                    )
+                    for byte_range in other_ranges
+                )
+
+                try:
+                    for future in as_completed(futures):
+                        future.result()
+
+                except BaseException:
+                    stop.set()
+                    raise
+
+            if not stop.is_set():
+                release_page_cache(file)
+
+        if stop.is_set():
+            os.remove(temp_path)
+            return False
+
+        os.replace(temp_path, download_path)
+
+    except BaseException:
+        # Ranges land out of order, so a partial file has holes and cannot be
+        # resumed; remove it instead of leaving a sparse file behind
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+    live_manager.update_task(task, completed=100)
+    return True
+
+def start_task(func, item, task_id, live_manager, *args):
     """
-    Manage the status of running tasks and update their progress.
+    Reveals the progress bar of a task once a worker thread picks it up, then
+    executes the task.
 
     Args:
-        futures (dict): A dictionary where keys are futures representing the
-                        tasks that have been submitted for execution, and
-                        values are the associated task identifiers in the
-                        job progress tracking system.
+        func (callable): The function to execute for the item.
+        item: The item to process.
+        task_id (int): The task identifier in the job progress tracking
+                       system.
         live_manager (LiveManager): An object responsible for tracking the
                                     progress of tasks, providing methods to
                                     update and manage task visibility.
+        *args: Additional arguments passed to `func`.
+    """
+    live_manager.update_task(task_id, visible=True)
+    return func(item, task_id, live_manager, *args)
+
+def log_failed_tasks(futures, live_manager):
     """
-    while futures:
-        for future in list(futures.keys()):
-            if future.running():
-                task_id = futures.pop(future)
-                live_manager.update_task(task_id, visible=True)
+    Reports the exception of every failed future to the live log panel.
+
+    Args:
+        futures (iterable): The completed futures to inspect.
+        live_manager (LiveManager): An object responsible for managing and
+                                    tracking the progress of live tasks.
+    """
+    for future in futures:
+        exc = future.exception()
+        if exc is not None:
+            live_manager.update_log("Download error", str(exc))
 
 def run_in_parallel(func, items, live_manager, identifier, *args):
     """
@@ -96,13 +380,26 @@ def run_in_parallel(func, items, live_manager, identifier, *args):
         *args: Additional arguments passed to `func` for each execution.
     """
     num_items = len(items)
-    futures = {}
+    pending = set()
 
     with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-        live_manager.add_overall_task(identifier, num_items)
+        overall_task = live_manager.add_overall_task(identifier, num_items)
 
+        # Keep a bounded window of submissions; each progress bar stays hidden
+        # until a worker actually starts on it
         for current_task, item in enumerate(items):
-            task_id = live_manager.add_task(current_task=current_task)
-            future = executor.submit(func, item, task_id, live_manager, *args)
-            futures[future] = task_id
-            manage_running_tasks(futures, live_manager)
+            if len(pending) >= MAX_PENDING:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                log_failed_tasks(done, live_manager)
+
+            task_id = live_manager.add_task(
+                current_task=current_task, visible=False,
+                overall_task=overall_task
+            )
+            pending.add(
+                executor.submit(
+                    start_task, func, item, task_id, live_manager, *args
+                )
+            )
+
+        log_failed_tasks(as_completed(pending), live_manager)
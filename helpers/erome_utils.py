@@ -1,12 +1,17 @@
 """
 This module provides functions for validating and processing Erome album URLs,
-as well as extracting relevant information such as profile names and hostnames.
+as well as extracting relevant information such as profile names.
 """
 
 import sys
-from urllib.parse import urlparse
+from urllib.parse import urlsplit
 
 HOST_NAME = "www.erome.com"
+HOST_URL = f"https://{HOST_NAME}/"
+REGIONS = (
+    "cn", "cz", "de", "es", "fr", "it", "nl", "jp", "pt", "pl", "rt"
+)
+REGION_HOST_NAMES = frozenset(f"{region}.erome.com" for region in REGIONS)
 
 def validate_url(album_url):
     """
@@ -18,17 +23,17 @@ def validate_url(album_url):
     Returns:
         str: The normalized URL using the global domain (`HOST_NAME`).
     """
-    parsed_url = urlparse(album_url)
-    regions = [
-        "cn", "cz", "de", "es", "fr", "it", "nl", "jp", "pt", "pl", "rt"
-    ]
+    # Most URLs already use the global domain and need no parsing
+    if album_url.startswith(HOST_URL):
+        return album_url
+
+    parsed_url = urlsplit(album_url)
 
     if parsed_url.netloc == HOST_NAME:
         return album_url
 
-    for region in regions:
-        if parsed_url.netloc == region + ".erome.com":
-            return f"https://{HOST_NAME}{parsed_url.path}"
+    if parsed_url.netloc in REGION_HOST_NAMES:
+        return f"https://{HOST_NAME}{parsed_url.path}"
 
     print("Provide a valid Erome URL.")
     return None
@@ -48,25 +53,10 @@ def extract_profile_name(profile_url):
                     error message and exits the program.
     """
     try:
-        return profile_url.split('/')[-1]
+        return profile_url.rpartition('/')[2]
 
     except IndexError:
         print("Invalid profile URL.")
         sys.exit(1)
 
     return None
-
-def extract_hostname(url):
-    """
-    Extracts the hostname from the given URL.
-
-    Args:
-        url (str): The URL from which to extract the hostname.
-
-    Returns:
-        str: The extracted hostname.
-    """
-#    extracted = tldextract.extract(url)
-#    return f"{extracted.domain}.{extracted.suffix}"
-    parsed_url = urlparse(url)
-    return parsed_url.netloc
@@ -1,21 +1,28 @@
 """
 This module provides utility functions for file input and output operations. It 
 includes methods to read the contents of a file and to write content to a file, 
-with optional support for clearing the file.
+with optional support for clearing the file, as well as to list the files
+already present in a directory.
 """
 
+import os
+
 def read_file(filename):
     """
-    Reads the contents of a file and returns a list of its lines.
+    Reads the lines of a file lazily, one at a time.
 
     Args:
         filename (str): The path to the file to be read.
 
-    Returns:
-        list: A list of lines from the file, with newline characters removed.
+    Yields:
+        str: Each non-blank line of the file, with surrounding whitespace and
+             the newline character removed.
     """
     with open(filename, 'r', encoding='utf-8') as file:
-        return file.read().splitlines()
+        for line in file:
+            line = line.strip()
+            if line:
+                yield line
 
 def write_file(filename, content=''):
     """
@@ -29,3 +36,38 @@ def write_file(filename, content=''):
     """
     with open(filename, 'w', encoding='utf-8') as file:
         file.write(content)
+
+def clear_file(filename):
+    """
+    Clears a file, skipping the write entirely when the file is already empty
+    or does not exist.
+
+    Args:
+        filename (str): The path to the file to be cleared.
+    """
+    try:
+        if os.path.getsize(filename):
+            write_file(filename)
+
+    except FileNotFoundError:
+        pass
+
+def get_files_in_dir(directory):
+    """
+    Lists the regular files of a directory using a single directory scan.
+
+    Args:
+        directory (str): The path to the directory to scan.
+
+    Returns:
+        set: The names of the files in the directory. Empty if the directory
+             does not exist.
+    """
+    # `is_file` is answered from the directory entry itself on most
+    # platforms, so no file is stat'ed
+    try:
+        with os.scandir(directory) as entries:
+            return {entry.name for entry in entries if entry.is_file()}
+
+    except FileNotFoundError:
+        return set()
@@ -7,16 +7,78 @@ clearing the terminal, making it reusable across projects.
 
 import os
 import sys
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 
 import requests
-from bs4 import BeautifulSoup
+from lxml import html
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .download_utils import MAX_WORKERS, RANGE_SEGMENTS
 
 DOWNLOAD_FOLDER = "Downloads"
 
+# Download directories already ensured by this process, so that albums sharing
+# a folder do not repeat the mkdir
+CREATED_DIRECTORIES = set()
+USER_AGENT = "Mozilla/5.0"
+
+# ANSI sequence that homes the cursor and clears the screen and scrollback,
+# the same output as the `clear` command
+CLEAR_SEQUENCE = "\033[H\033[2J\033[3J"
+
+# Number of pages fetched ahead of the one being consumed
+PREFETCH_DEPTH = 2
+
+# Shared session for page fetches and downloads. Keep-alive connections are
+# reused across files instead of paying a new TCP and TLS handshake each time,
+# and cookies set by Erome (`laravel_session`, `XSRF-TOKEN`) are carried over
+# from one album to the next
+SESSION = requests.Session()
+RETRY = Retry(
+    total=3,
+    backoff_factor=0.3,
+    status_forcelist=[429, 500, 502, 503, 521]
+)
+
+def mount_session_adapter(album_workers=1):
+    """
+    Mounts a connection pool on the shared session that is large enough for
+    the peak number of concurrent requests.
+
+    Args:
+        album_workers (int, optional): The number of albums downloaded at the
+                                       same time (default is 1).
+
+    Returns:
+        HTTPAdapter: The adapter mounted for both HTTP and HTTPS.
+    """
+    # Every file of every album may be split into ranges, plus the page
+    # prefetcher. The pool does not block when exhausted, since a request
+    # waiting for a connection held by another download of the same file
+    # would never be served
+    adapter = HTTPAdapter(
+        pool_connections=16,
+        pool_maxsize=(
+            album_workers * MAX_WORKERS * RANGE_SEGMENTS + PREFETCH_DEPTH
+        ),
+        max_retries=RETRY
+    )
+    SESSION.mount("https://", adapter)
+    SESSION.mount("http://", adapter)
+    return adapter
+
+ADAPTER = mount_session_adapter()
+
+# Headers shared by every request are set once on the session (requests
+# already sends `Connection: keep-alive` by default)
+SESSION.headers.update({"User-Agent": USER_AGENT})
+
 def fetch_page(url, timeout=10):
     """
-    Fetches the HTML content of a webpage and parses it into a BeautifulSoup
-    object.
+    Fetches the HTML content of a webpage and parses it into an lxml element
+    tree.
 
     Args:
         url (str): The URL of the webpage to fetch.
@@ -24,28 +86,53 @@ def fetch_page(url, timeout=10):
                                  response. Defaults to 10.
 
     Returns:
-        BeautifulSoup: A BeautifulSoup object representing the HTML content of
-                       the page.
+        lxml.html.HtmlElement: The root element of the parsed HTML content of
+                               the page.
 
     Raises:
         SystemExit: If an error occurs during the HTTP request, the program
                     exits after printing the error message.
     """
-    # Create a new session per worker
-    session = requests.Session()
-
     try:
-        response = session.get(url, timeout=timeout)
+        response = SESSION.get(url, timeout=timeout)
         response.raise_for_status()
-        return BeautifulSoup(response.text, 'html.parser')
+        return html.fromstring(response.content)
 
     except requests.RequestException as req_err:
         print(f"Error fetching page {url}: {req_err}")
         sys.exit(1)
 
+def prefetch_pages(urls, depth=PREFETCH_DEPTH):
+    """
+    Fetches pages a few URLs ahead of the consumer, so that the next page is
+    usually ready by the time the current one has been processed.
+
+    Args:
+        urls (iterable): The URLs of the pages to fetch, in order.
+        depth (int, optional): The number of pages fetched in the background
+                               ahead of the consumer (default is
+                               `PREFETCH_DEPTH`).
+
+    Yields:
+        tuple: The URL and its parsed page, in the order of `urls`.
+    """
+    pending = deque()
+
+    with ThreadPoolExecutor(max_workers=depth) as executor:
+        for url in urls:
+            pending.append((url, executor.submit(fetch_page, url)))
+            if len(pending) > depth:
+                page_url, future = pending.popleft()
+                yield page_url, future.result()
+
+        while pending:
+            page_url, future = pending.popleft()
+            yield page_url, future.result()
+
 def create_download_directory(directory_name):
     """
-    Creates a directory for downloads if it doesn't exist.
+    Creates a directory for downloads if it doesn't exist. Directories already
+    created by this process are not checked again.
 
     Args:
         directory_name (str): The name used to create the download directory.
@@ -57,24 +144,36 @@ def create_download_directory(directory_name):
         OSError: If there is an error creating the directory.
     """
     download_path = os.path.join(DOWNLOAD_FOLDER, directory_name)
+    if download_path in CREATED_DIRECTORIES:
+        return download_path
 
     try:
-        os.makedirs(download_path, exist_ok=True)
-        return download_path
+        # A single mkdir covers the usual case where the parent folders
+        # (the downloads folder, the profile folder) already exist
+        try:
+            os.mkdir(download_path)
+
+        except FileNotFoundError:
+            os.makedirs(download_path, exist_ok=True)
+
+    except FileExistsError:
+        pass
 
     except OSError as os_err:
         print(f"Error creating directory: {os_err}")
         sys.exit(1)
 
+    CREATED_DIRECTORIES.add(download_path)
+    return download_path
+
 def clear_terminal():
     """
     Clears the terminal screen based on the operating system.
     """
-    commands = {
-        'nt': 'cls',      # Windows
-        'posix': 'clear'  # macOS and Linux
-    }
-
-    command = commands.get(os.name)
-    if command:
-        os.system(command)
+    if os.name == 'nt':
+        os.system('cls')
+
+    elif sys.stdout.isatty():
+        # Writing the sequence directly avoids spawning a `clear` process
+        sys.stdout.write(CLEAR_SEQUENCE)
+        sys.stdout.flush()
@@ -40,11 +40,15 @@ class LiveManager:
 
     def add_overall_task(self, description, num_tasks):
         """Call ProgressManager to add an overall task."""
-        self.progress_manager.add_overall_task(description, num_tasks)
+        return self.progress_manager.add_overall_task(description, num_tasks)
 
-    def add_task(self, current_task=0, total=100):
+    def add_task(
+        self, current_task=0, total=100, visible=True, overall_task=None
+    ):
         """Call ProgressManager to add an individual task."""
-        task_id = self.progress_manager.add_task(current_task, total)
+        task_id = self.progress_manager.add_task(
+            current_task, total, visible, overall_task
+        )
         return task_id
 
     def update_task(self, task_id, completed=None, advance=0, visible=True):
@@ -18,8 +18,11 @@ class ProgressManager:
         color (str): The color used for task descriptions in the progress bar.
         overall_progress (Progress): Progress bar for overall task completion.
         task_progress (Progress): Progress bar for tracking individual tasks.
-        overall_task (TaskID): ID of the overall progress task.
-        num_tasks (int): Total number of tasks to be tracked.
+        overall_task (TaskID): ID of the most recent overall progress task.
+        num_tasks (dict): Total number of tasks tracked by each overall task.
+        parent_tasks (dict): The overall task each individual task counts
+                             towards, so that several overall tasks can run
+                             at the same time.
     """
 
     def __init__(self, task_name, item_description, color="light_cyan3"):
@@ -29,7 +32,8 @@ class ProgressManager:
         self.overall_progress = self.create_progress_bar()
         self.task_progress = self.create_progress_bar()
         self.overall_task = 0
-        self.num_tasks = 0
+        self.num_tasks = {}
+        self.parent_tasks = {}
 
     @staticmethod
     def adjust_description(description, max_length=8):
@@ -58,24 +62,36 @@ class ProgressManager:
 
     def add_overall_task(self, description, num_tasks):
         """
-        Adds an overall progress task with a given description and total tasks.
+        Adds an overall progress task with a given description and total tasks,
+        and returns its ID.
         """
-        self.num_tasks = num_tasks
         overall_description = self.adjust_description(description)
         self.overall_task = self.overall_progress.add_task(
             f"[{self.color}]{overall_description}",
             total=num_tasks, completed=0
         )
+        self.num_tasks[self.overall_task] = num_tasks
+        return self.overall_task
 
-    def add_task(self, current_task=0, total=100):
+    def add_task(
+        self, current_task=0, total=100, visible=True, overall_task=None
+    ):
         """
-        Adds an individual task to the task progress bar.
+        Adds an individual task to the task progress bar, counting towards the
+        given overall task (the most recent one by default).
         """
+        if overall_task is None:
+            overall_task = self.overall_task
+
         task_description = (
             f"[{self.color}]{self.item_description} "
-            f"{current_task + 1}/{self.num_tasks}"
+            f"{current_task + 1}/{self.num_tasks[overall_task]}"
+        )
+        task_id = self.task_progress.add_task(
+            task_description, total=total, visible=visible
         )
-        return self.task_progress.add_task(task_description, total=total)
+        self.parent_tasks[task_id] = overall_task
+        return task_id
 
     def update_task(self, task_id, completed=None, advance=0, visible=True):
         """
@@ -91,9 +107,13 @@ class ProgressManager:
             )
 
         # Update the overall progress bar and remove the task progress bar
-        # when a task is finished
+        # when a task is finished. A finished task may still receive a final
+        # update, so the overall task is only advanced the first time
         if self.task_progress.tasks[task_id].finished:
-            self.overall_progress.advance(self.overall_task)
+            overall_task = self.parent_tasks.pop(task_id, None)
+            if overall_task is not None:
+                self.overall_progress.advance(overall_task)
+
             self.task_progress.update(task_id, visible=False)
 
     def create_progress_table(self):
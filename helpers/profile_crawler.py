@@ -1,7 +1,7 @@
 """
 This module provides functionality to extract album links from user profile
-pages on erome. It utilizes the BeautifulSoup library for HTML parsing and
-requests for handling HTTP requests.
+pages on erome. It utilizes lxml for HTML parsing and requests for handling
+HTTP requests.
 
 Usage:
     Run the script from the command line, providing the profile page URL as an
@@ -14,14 +14,30 @@ Example:
 
 import re
 import sys
+from concurrent.futures import ThreadPoolExecutor
 
-import requests
-from bs4 import BeautifulSoup
+from lxml import etree
 
 from .managers.progress_manager import ProgressManager
+from .erome_utils import HOST_NAME
+from .general_utils import fetch_page
+from .file_utils import write_file
 
 DUMP_FILE = "profile_dump.txt"
-HOST_PAGE = "https://www.erome.com"
+HOST_PAGE = f"https://{HOST_NAME}"
+
+# Profile pages fetched at the same time; all of them hit the same host, so
+# this is kept modest
+PAGE_WORKERS = 8
+
+# Album links (the `album-link` class) and every link of a page, compiled once
+# at import time
+ALBUM_LINKS_XPATH = etree.XPath(
+    "//a[contains(concat(' ', normalize-space(@class), ' '), ' album-link ')]"
+    "/@href",
+    smart_strings=False
+)
+LINKS_XPATH = etree.XPath("//a/@href", smart_strings=False)
 
 COLORS = {
     'PURPLE': '\033[95m',
@@ -36,107 +52,102 @@ COLORS = {
     'END': '\033[0m'
 }
 
-def fetch_profile_page(url):
+def compile_page_pattern(profile, next_page_tag="?page="):
     """
-    Fetches the profile page and returns its BeautifulSoup object.
+    Compiles the regular expression matching the page links of a profile.
 
     Args:
-        url (str): The URL of the profile page.
+        profile (str): The profile identifier to match in the URL path.
+        next_page_tag (str, optional): The query parameter to indicate the
+                                       page number in the URL
+                                       (default is "?page=").
 
     Returns:
-        BeautifulSoup: The BeautifulSoup object containing the HTML.
+        re.Pattern: A pattern matching `/<profile>?page=<number>` and capturing
+                    the page number. Both parts are escaped, so profile names
+                    containing regex metacharacters are matched literally.
+                    Page numbers in URLs are ASCII, so `\\d` is restricted to
+                    ASCII digits.
+    """
+    return re.compile(
+        f"/{re.escape(profile)}{re.escape(next_page_tag)}(\\d+)", re.ASCII
+    )
 
-    Raises:
-        requests.RequestException: If there is an error with the HTTP request.
+def discover_max_page(tree, page_pattern):
     """
-    try:
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        return BeautifulSoup(response.text, 'html.parser')
+    Finds the number of pages of a profile from the page links of its first
+    page.
 
-    except requests.RequestException as req_err:
-        print(f"Error fetching the page: {req_err}")
-        sys.exit(1)
+    Args:
+        tree (lxml.html.HtmlElement): The parsed HTML of the profile page.
+        page_pattern (re.Pattern): The pattern matching the page links of the
+                                   profile, as built by
+                                   `compile_page_pattern`.
+
+    Returns:
+        int: The highest page number linked, or 1 if the profile has a single
+             page.
+    """
+    # The page number is captured by the same search that matches the link
+    return max(
+        (
+            int(match.group(1))
+            for match in map(page_pattern.search, LINKS_XPATH(tree)) if match
+        ),
+        default=1
+    )
 
-def get_profile_page_links(soup, profile, next_page_tag="?page="):
+def get_profile_page_links(tree, profile, next_page_tag="?page="):
     """
-    Extracts and formats profile page links from a BeautifulSoup object.
+    Builds the links of every profile page after the first one.
 
     Args:
-        soup (BeautifulSoup): The BeautifulSoup object representing the HTML
-                              content to search through.
+        tree (lxml.html.HtmlElement): The parsed HTML of the profile page.
         profile (str): The profile identifier to match in the URL path.
-        next_page_tag (str, optional): The query parameter to indicate the 
+        next_page_tag (str, optional): The query parameter to indicate the
                                        page number in the URL
                                        (default is "?page=").
 
-    Raises:
-        ValueError: If no valid profile page links are found in the provided
-                    `soup`.
+    Returns:
+        list: The links of pages 2 to the last one; empty for a single page
+              profile.
     """
-    try:
-        # Regular expression to find all 'a' tags with href that match
-        # "?page=" followed by a number
-        page_links = soup.find_all(
-            'a', {'href': re.compile(f"/{profile}\\{next_page_tag}\\d+")}
-        )
-
-        page_numbers = []
-        for page_link in page_links:
-            try:
-                # Extract page number using regex and convert to integer
-                page_number = int(
-                    re.search(r'page=(\d+)', page_link['href']).group(1)
-                )
-                page_numbers.append(page_number)
-
-            except (AttributeError, ValueError, TypeError) as err:
-                print(
-                    "Error extracting page index from "
-                    f"{page_link['href']}: {err}."
-                )
-
-        max_page_number = max(page_numbers) if page_numbers else None
-
-        formatted_page_links = []
-        if max_page_number is not None:
-            # The last item of the page_links list isn't useful, so it is
-            # discarded
-            formatted_page_links = [
-                HOST_PAGE + page_link['href'] for page_link in page_links[:-1]
-            ]
-
-        return formatted_page_links
-
-    except (AttributeError, TypeError, KeyError) as exc:
-        print(f"An error occurred while processing the soup: {exc}")
-        return []
-
-def extract_album_links_in_page(soup):
+    # The links are matched and built from the same profile and tag, so the
+    # discovered pages always belong to the links returned
+    page_pattern = compile_page_pattern(profile, next_page_tag)
+    max_page_number = discover_max_page(tree, page_pattern)
+
+    # Pages are numbered contiguously, so every page after the first is
+    # derived from the highest number instead of taken from the pagination
+    # anchors, which repeat pages in the previous/next links
+    return [
+        f"{HOST_PAGE}/{profile}{next_page_tag}{page_number}"
+        for page_number in range(2, max_page_number + 1)
+    ]
+
+def extract_album_links_in_page(tree):
     """
-    Extracts album links from a BeautifulSoup object representing a webpage.
+    Extracts album links from a parsed webpage.
 
     Args:
-        soup (BeautifulSoup): The BeautifulSoup object representing the HTML 
-                              content to search through.
+        tree (lxml.html.HtmlElement): The parsed HTML of the page.
 
     Returns:
         list: A list of strings, where each string is a link to an album. If no
               album links are found, an empty list is returned.
     """
-    album_links_items = soup.find_all(
-        'a', {'class': "album-link", 'href': True}
-    )
-    album_links = [item['href'] for item in album_links_items]
-    return album_links
+    return ALBUM_LINKS_XPATH(tree)
 
-def get_profile_album_links(pages):
+def get_profile_album_links(pages, max_workers=PAGE_WORKERS):
     """
-    Retrieves album links from a list of profile page links.
+    Retrieves album links from a list of profile page links. The pages are
+    fetched concurrently, while the links keep the order of the pages.
 
     Args:
-        page (list): A list of strings representing URLs of profile pages 
-                     from which to extract album links.
+        pages (list): A list of strings representing URLs of profile pages
+                      from which to extract album links.
+        max_workers (int, optional): The number of pages fetched at the same
+                                     time (default is `PAGE_WORKERS`).
 
     Returns:
         list: A list of strings, where each string is a link to an album found
@@ -148,11 +159,12 @@ def get_profile_album_links(pages):
 
     with ProgressManager.create_progress_bar() as progress_bar:
         task = progress_bar.add_task('[cyan]Progress', total=num_pages)
-        for page in pages:
-            soup = fetch_profile_page(page)
-            album_links = extract_album_links_in_page(soup)
-            profile_album_links.extend(album_links)
-            progress_bar.advance(task)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for tree in executor.map(fetch_page, pages):
+                album_links = extract_album_links_in_page(tree)
+                profile_album_links.extend(album_links)
+                progress_bar.advance(task)
 
     return profile_album_links
 
@@ -166,10 +178,9 @@ def generate_profile_dump(profile_album_links):
                                     link to an album associated with the
                                     specified profile.
     """
-    with open(DUMP_FILE, 'w', encoding='utf-8') as file:
-        file.writelines(
-            f"{album_link}\n" for album_link in profile_album_links
-        )
+    # One write of the joined links rather than one per link
+    content = "".join(f"{album_link}\n" for album_link in profile_album_links)
+    write_file(DUMP_FILE, content)
 
 def process_profile_url(url):
     """
@@ -177,27 +188,20 @@ def process_profile_url(url):
 
     Args:
         url (str): The URL of the profile to process.
-
-    Raises:
-        ValueError: If an error occurs during the extraction of links from the
-                    profile page.
     """
-    profile = url.split('/')[-1]
+    profile = url.rpartition('/')[2]
     print(f"Dumping profile: {COLORS['BOLD']}{profile}{COLORS['END']}")
-    soup = fetch_profile_page(url)
-
-    try:
-        page_links = get_profile_page_links(soup, profile)
-        page_links.insert(0, url)
-
-        profile_album_links = get_profile_album_links(page_links)
-        generate_profile_dump(profile_album_links)
+    tree = fetch_page(url)
+    page_links = get_profile_page_links(tree, profile)
 
-    except ValueError as val_err:
-        print(f"Value error: {val_err}")
+    # The first page is already parsed; only the following ones are fetched
+    profile_album_links = extract_album_links_in_page(tree)
+    profile_album_links.extend(get_profile_album_links(page_links))
 
-    finally:
-        print("[\u2713] Dump file successfully generated.\n")
+    # Albums can be linked more than once (thumbnail and title, or pages
+    # shifting while being crawled); keep the first occurrence of each
+    generate_profile_dump(list(dict.fromkeys(profile_album_links)))
+    print("[\u2713] Dump file successfully generated.\n")
 
 def main():
     """
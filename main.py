@@ -9,32 +9,113 @@ Usage:
     optional arguments for profile or album URLs.
 """
 
-from helpers.profile_crawler import process_profile_url
-from helpers.file_utils import read_file, write_file
-from helpers.general_utils import clear_terminal
+import argparse
+from concurrent.futures import (
+    ThreadPoolExecutor, FIRST_COMPLETED, as_completed, wait
+)
+
+from helpers.profile_crawler import process_profile_url, DUMP_FILE
+from helpers.file_utils import read_file, clear_file
+from helpers.general_utils import (
+    clear_terminal, prefetch_pages, mount_session_adapter
+)
 from album_downloader import (
     extract_profile_name, validate_url, download_album,
     setup_parser, initialize_managers
 )
 
 DEFAULT_FILE = 'URLs.txt'
-DUMP_FILE = 'profile_dump.txt'
 
-def process_urls(urls, profile_name):
+# Albums downloaded at the same time; each album already downloads several
+# files in parallel, so this stays low
+ALBUM_WORKERS = 1
+
+def unique_album_urls(urls):
+    """
+    Validates URLs and yields each album once, in order of first appearance.
+
+    Args:
+        urls (iterable): The URLs to validate, consumed as they are needed.
+
+    Yields:
+        str: The normalized URL of each album not seen before.
+    """
+    seen = set()
+
+    # Deduplicate after normalization, so that regional links to the same
+    # album collapse into one; invalid URLs are skipped instead of aborting
+    # the whole batch
+    for url in urls:
+        album_url = validate_url(url)
+        if album_url and album_url not in seen:
+            seen.add(album_url)
+            yield album_url
+
+def process_urls(urls, profile_name, max_workers=ALBUM_WORKERS):
     """
     Validates and processes a list of URLs to download items.
 
     Args:
-        urls (list): A list of URLs to process.
+        urls (iterable): The URLs to process, consumed as they are needed.
         profile_name (str): The name of the profile associated with the URLs.
+        max_workers (int, optional): The number of albums downloaded at the
+                                     same time (default is `ALBUM_WORKERS`).
     """
+    # Size the connection pool for the albums downloaded at the same time
+    mount_session_adapter(max_workers)
+
     live_manager = initialize_managers()
+    album_urls = unique_album_urls(urls)
+    pending = set()
+
     with live_manager.live:
-        for url in urls:
-            validated_url = validate_url(url)
-            download_album(validated_url, live_manager, profile=profile_name)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            # Album pages are fetched ahead while the current albums
+            # download; waiting for a free worker before taking the next page
+            # keeps the prefetch bounded
+            for album_url, tree in prefetch_pages(album_urls):
+                if len(pending) >= max_workers:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        future.result()
+
+                pending.add(
+                    executor.submit(
+                        download_album, album_url, live_manager,
+                        profile=profile_name, tree=tree
+                    )
+                )
+
+            for future in as_completed(pending):
+                future.result()
+
         live_manager.stop()
 
+def positive_int(value):
+    """
+    Parses a command-line value as a strictly positive integer.
+
+    Args:
+        value (str): The raw command-line value.
+
+    Returns:
+        int: The parsed value.
+
+    Raises:
+        argparse.ArgumentTypeError: If the value is not a positive integer.
+    """
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+
+    if number < 1:
+        raise argparse.ArgumentTypeError(
+            f"expected a positive integer, got '{value}'"
+        )
+
+    return number
+
 def handle_profile_processing(profile_url):
     """
     Processes a profile URL and extracts the profile name.
@@ -57,18 +138,23 @@ def main():
     Main entry point for the album download processing application.
     """
     clear_terminal()
-    write_file(DUMP_FILE)
+    clear_file(DUMP_FILE)
 
     parser = setup_parser()
+    parser.add_argument(
+        '-w', '--workers', dest='workers', type=positive_int,
+        default=ALBUM_WORKERS, metavar='num_albums',
+        help='Number of albums to download at the same time'
+    )
     args = parser.parse_args()
 
     file_to_read = DUMP_FILE if args.profile else DEFAULT_FILE
     profile_name = handle_profile_processing(args.profile)
 
     urls = read_file(file_to_read)
-    process_urls(urls, profile_name)
+    process_urls(urls, profile_name, max_workers=args.workers)
 
-    write_file(DEFAULT_FILE)
+    clear_file(DEFAULT_FILE)
 
 if __name__ == '__main__':
     main()